@@ -21,10 +21,20 @@ Package for the application models and service routes
 This module creates and configures the Flask app and sets up the logging
 and SQL database
 """
+import os
 import sys
 from flask import Flask
 from service import config
 from service.common import log_handlers
+from service.common.json_provider import OrjsonProvider
+
+# gunicorn's gevent worker already patches the standard library before it
+# loads the app, but psycopg2 is a C extension and needs its own wait callback
+# so that database waits yield to other greenlets. This only has to run before
+# the first connection is opened
+if os.getenv("USE_GEVENT", "false").lower() in ["true", "yes", "1"]:
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
 
 # NOTE: Do not change the order of this code
 # The Flask app must be created
@@ -36,6 +46,9 @@ app = Flask(__name__)  # pylint: disable=invalid-name
 # Load Configurations
 app.config.from_object(config)
 
+# Serialize JSON responses with orjson
+app.json = OrjsonProvider(app)
+
 # Dependencies require we import the routes AFTER the Flask app is created
 # pylint: disable=wrong-import-position, wrong-import-order, cyclic-import
 from service import routes, models        # noqa: F401, E402
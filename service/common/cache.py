@@ -0,0 +1,87 @@
+######################################################################
+# Copyright 2016, 2023 John J. Rofrano. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+######################################################################
+
+"""
+Cache
+
+This module contains a small thread safe least recently used cache
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """A bounded mapping that discards the least recently used entries
+
+    When ttl is given, entries also expire ttl seconds after they are stored
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._evictions = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Returns the value for key, or None if it is not cached or has expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def version(self):
+        """Returns a token that changes whenever an entry is evicted or cleared"""
+        with self._lock:
+            return self._evictions
+
+    def put(self, key, value, version=None):
+        """Caches value under key, discarding the oldest entries if full
+
+        If version is given, the value is only cached when nothing has been
+        evicted since version() returned it, so a value read before an update
+        cannot be stored after that update evicted the old one
+        """
+        with self._lock:
+            if version is not None and version != self._evictions:
+                return
+            expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def evict(self, key):
+        """Removes key from the cache if it is present"""
+        with self._lock:
+            self._evictions += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Removes everything from the cache"""
+        with self._lock:
+            self._evictions += 1
+            self._data.clear()
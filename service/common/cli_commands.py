@@ -1,9 +1,26 @@
 """
 Flask CLI Command Extensions
 """
+from sqlalchemy import text
 from service import app
 from service.models import db
 
+# Upgrades an existing product table in place. Every statement can be run
+# again safely, and no existing rows are removed
+MIGRATIONS = [
+    # Integer cents used for price lookups
+    "ALTER TABLE product ADD COLUMN IF NOT EXISTS price_cents BIGINT",
+    "UPDATE product SET price_cents = ROUND(price * 100)::bigint WHERE price_cents IS NULL",
+    "ALTER TABLE product ALTER COLUMN price_cents SET NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_product_price_cents ON product (price_cents)",
+    # Last change time used to build ETags, stored in UTC like datetime.utcnow()
+    "ALTER TABLE product ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE",
+    "UPDATE product SET updated_at = (now() AT TIME ZONE 'utc') WHERE updated_at IS NULL",
+    "ALTER TABLE product ALTER COLUMN updated_at SET NOT NULL",
+    # Listing by category and availability
+    "CREATE INDEX IF NOT EXISTS ix_product_category_available ON product (category, available)",
+]
+
 
 ######################################################################
 # Command to force tables to be rebuilt
@@ -18,3 +35,19 @@ def db_create():
     db.drop_all()
     db.create_all()
     db.session.commit()
+
+
+######################################################################
+# Command to upgrade existing tables without losing data
+# Usage: flask db-migrate
+######################################################################
+@app.cli.command("db-migrate")
+def db_migrate():
+    """
+    Adds any columns and indexes that are missing from an existing
+    database and fills them in from the current data.
+    """
+    for statement in MIGRATIONS:
+        app.logger.info("Migrating: %s", statement)
+        db.session.execute(text(statement))
+    db.session.commit()
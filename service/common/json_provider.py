@@ -0,0 +1,63 @@
+######################################################################
+# Copyright 2016, 2023 John J. Rofrano. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+######################################################################
+
+"""
+JSON Provider
+
+This module contains an orjson backed JSON provider so that Flask
+serializes responses with orjson instead of the standard library
+"""
+from decimal import Decimal
+import orjson
+from flask.json.provider import JSONProvider
+
+
+def orjson_default(obj):
+    """Converts Decimal values, which orjson does not know about, to strings
+
+    This hook never sees Enum members: orjson encodes them by value on its
+    own, so a Category becomes an int rather than raising TypeError. Callers
+    must convert enums to names themselves before encoding, as
+    Product.serialize() does
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """A Flask JSON provider that uses orjson
+
+    Unlike Flask's default provider, Enum members are encoded silently by
+    value instead of raising TypeError, so convert them to names first
+    """
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs) -> str:
+        """Serializes obj to a JSON formatted string"""
+        return orjson.dumps(obj, default=orjson_default).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserializes a JSON formatted string or bytes into an object"""
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Serializes the arguments into a JSON response without a str round-trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=orjson_default), mimetype=self.mimetype
+        )
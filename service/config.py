@@ -3,6 +3,7 @@ Global Configuration for Application
 """
 import os
 import logging
+from sqlalchemy.pool import NullPool
 
 # Get configuration from environment
 DATABASE_URI = os.getenv(
@@ -13,7 +14,26 @@ DATABASE_URI = os.getenv(
 # Configure SQLAlchemy
 SQLALCHEMY_DATABASE_URI = DATABASE_URI
 SQLALCHEMY_TRACK_MODIFICATIONS = False
-# SQLALCHEMY_POOL_SIZE = 2
+
+# Configure the connection pool. Behind PgBouncer in transaction mode the
+# bouncer does the pooling, so each worker opens and closes connections freely
+if os.getenv("USE_PGBOUNCER", "false").lower() in ["true", "yes", "1"]:
+    SQLALCHEMY_ENGINE_OPTIONS = {"poolclass": NullPool}
+else:
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DATABASE_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("DATABASE_MAX_OVERFLOW", "20")),
+        "pool_recycle": int(os.getenv("DATABASE_POOL_RECYCLE", "300")),
+        "pool_pre_ping": False,
+    }
+
+# Cache single Product lookups in each worker process. This is only safe with a
+# single worker process that is the sole writer to the database: an update only
+# evicts the copy held by the worker that handled it, so other workers can serve
+# the old Product (and answer 304 to its old ETag) until the entry expires
+PRODUCT_CACHE_ENABLED = os.getenv("PRODUCT_CACHE_ENABLED", "false").lower() in ["true", "yes", "1"]
+PRODUCT_CACHE_SIZE = int(os.getenv("PRODUCT_CACHE_SIZE", "1024"))
+PRODUCT_CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", "30"))
 
 # Secret for session management
 SECRET_KEY = os.getenv("SECRET_KEY", "sup3r-s3cr3t")
@@ -25,14 +25,20 @@ Attributes:
 -----------
 name (string) - the name of the product
 description (string) - the description the product belongs to (i.e., dog, cat)
+price (decimal) - the price of the product
+price_cents (integer) - the price in whole cents, kept in step with price for lookups
 available (boolean) - True for products that are available for adoption
+updated_at (datetime) - when the product was last created or changed
 
 """
 import logging
+from datetime import datetime
 from enum import Enum
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, update
+from sqlalchemy.orm import validates
 
 logger = logging.getLogger("flask.app")
 
@@ -49,6 +55,53 @@ class DataValidationError(Exception):
     """Used for an data validation errors when deserializing"""
 
 
+# Largest price in cents that fits in the BIGINT price_cents column, and the
+# most whole digits a price string can have before it cannot possibly fit
+MAX_PRICE_CENTS = 2**63 - 1
+MAX_PRICE_DIGITS = len(str(MAX_PRICE_CENTS)) - 2
+
+
+def parse_price(price) -> Decimal:
+    """Converts a price to a finite Decimal, stripping quotes and spaces from strings"""
+    if isinstance(price, str):
+        price = price.strip(' "')
+    try:
+        value = Decimal(price)
+    except (ArithmeticError, ValueError, TypeError) as error:
+        raise DataValidationError(f"Invalid price: {price}") from error
+    if not value.is_finite():
+        raise DataValidationError(f"Invalid price: {price}")
+    return value
+
+
+def price_to_cents(price) -> int:
+    """Converts a price to whole cents, stripping quotes and spaces from strings
+
+    Plain strings like "12.50" are split on the decimal point and rounded
+    half up without building a Decimal; anything else falls back to Decimal.
+    Raises DataValidationError for prices that are not finite or do not fit
+    in price_cents
+    """
+    cents = None
+    if isinstance(price, str):
+        stripped = price.strip(' "')
+        whole, _, fraction = stripped.partition(".")
+        if stripped.isascii() and whole.isdigit() and (fraction.isdigit() or not fraction):
+            if len(whole) > MAX_PRICE_DIGITS:
+                raise DataValidationError(f"Price out of range: {stripped[:MAX_PRICE_DIGITS]}...")
+            cents = int(whole) * 100 + int(fraction[:2].ljust(2, "0"))
+            if fraction[2:3] >= "5":
+                cents += 1
+    if cents is None:
+        try:
+            cents = int((parse_price(price) * 100).to_integral_value(ROUND_HALF_UP))
+        except (ArithmeticError, ValueError) as error:
+            raise DataValidationError("Price out of range") from error
+    if abs(cents) > MAX_PRICE_CENTS:
+        raise DataValidationError("Price out of range")
+    return cents
+
+
 class Category(Enum):
     """Enumeration of valid Product Categories"""
 
@@ -60,6 +113,10 @@ class Category(Enum):
     TOOLS = 5
 
 
+# Categories by name, for deserializing without enum attribute lookups
+CATEGORY_BY_NAME = {category.name: category for category in Category}
+
+
 class Product(db.Model):
     """
     Class that represents a Product
@@ -75,10 +132,19 @@ class Product(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(250), nullable=False)
     price = db.Column(db.Numeric, nullable=False)
+    price_cents = db.Column(db.BigInteger, nullable=False, index=True)
     available = db.Column(db.Boolean(), nullable=False, default=True)
     category = db.Column(
         db.Enum(Category), nullable=False, server_default=(Category.UNKNOWN.name)
     )
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    # Supports listing Products filtered by category and availability
+    __table_args__ = (
+        db.Index("ix_product_category_available", "category", "available"),
+    )
 
     ##################################################
     # INSTANCE METHODS
@@ -87,6 +153,12 @@ class Product(db.Model):
     def __repr__(self):
         return f"<Product {self.name} id=[{self.id}]>"
 
+    @validates("price")
+    def validate_price(self, _key, value):
+        """Keeps price_cents in step with every assignment to price"""
+        self.price_cents = None if value is None else price_to_cents(value)
+        return value
+
     def create(self):
         """
         Creates a Product to the database
@@ -132,7 +204,7 @@ class Product(db.Model):
         try:
             self.name = data["name"]
             self.description = data["description"]
-            self.price = Decimal(data["price"])
+            self.price = parse_price(data["price"])
             if isinstance(data["available"], bool):
                 self.available = data["available"]
             else:
@@ -140,9 +212,10 @@ class Product(db.Model):
                     "Invalid type for boolean [available]: "
                     + str(type(data["available"]))
                 )
-            self.category = getattr(Category, data["category"])  # create enum from string
-        except AttributeError as error:
-            raise DataValidationError("Invalid attribute: " + error.args[0]) from error
+            category = CATEGORY_BY_NAME.get(data["category"])  # create enum from string
+            if category is None:
+                raise DataValidationError("Invalid attribute: unknown category " + str(data["category"]))
+            self.category = category
         except KeyError as error:
             raise DataValidationError("Invalid product: missing " + error.args[0]) from error
         except TypeError as error:
@@ -189,6 +262,57 @@ class Product(db.Model):
         logger.info("Processing lookup for id %s ...", product_id)
         return cls.query.get(product_id)
 
+    @classmethod
+    def update_by_id(cls, product_id: int, data: dict):
+        """Updates a Product from a dictionary with a single UPDATE ... RETURNING
+
+        :param product_id: the id of the Product to update
+        :type product_id: int
+        :param data: a dictionary containing the new Product data
+        :type data: dict
+
+        :return: the updated Product, or None if not found
+        :rtype: Product
+
+        """
+        logger.info("Processing update for id %s ...", product_id)
+        product = cls().deserialize(data)
+        table = cls.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == product_id)
+            .values(
+                name=product.name,
+                description=product.description,
+                price=product.price,
+                price_cents=product.price_cents,
+                available=product.available,
+                category=product.category,
+            )
+            .returning(*table.c)
+        )
+        row = db.session.execute(statement).mappings().first()
+        db.session.commit()
+        return cls(**row) if row else None
+
+    @classmethod
+    def delete_by_id(cls, product_id: int) -> bool:
+        """Removes a Product by it's ID with a single DELETE ... RETURNING
+
+        :param product_id: the id of the Product to delete
+        :type product_id: int
+
+        :return: True if a Product was deleted, False if not found
+        :rtype: bool
+
+        """
+        logger.info("Processing delete for id %s ...", product_id)
+        table = cls.__table__
+        statement = delete(table).where(table.c.id == product_id).returning(table.c.id)
+        row = db.session.execute(statement).first()
+        db.session.commit()
+        return row is not None
+
     @classmethod
     def find_by_name(cls, name: str) -> list:
         """Returns all Products with the given name
@@ -215,10 +339,10 @@ class Product(db.Model):
 
         """
         logger.info("Processing price query for %s ...", price)
-        price_value = price
-        if isinstance(price, str):
-            price_value = Decimal(price.strip(' "'))
-        return cls.query.filter(cls.price == price_value)
+        # price_cents narrows the search on its index, price keeps the match exact
+        # Strings go through the cents fast path, Decimal is only for the exact compare
+        price_cents = price_to_cents(price)
+        return cls.query.filter(cls.price_cents == price_cents, cls.price == parse_price(price))
 
     @classmethod
     def find_by_availability(cls, available: bool = True) -> list:
@@ -18,12 +18,49 @@
 """
 Product Store Service with UI
 """
-from flask import jsonify, request, abort
-from flask import url_for  # noqa: F401 pylint: disable=unused-import
-from service.models import Product, Category
+import hashlib
+import re
+from functools import lru_cache
+import orjson
+from flask import Response, jsonify, request, abort, stream_with_context, url_for
+from sqlalchemy import String, select, type_coerce
+from service.models import db, Product, CATEGORY_BY_NAME, parse_price, price_to_cents
 from service.common import status  # HTTP Status Codes
+from service.common.cache import LRUCache
+from service.common.json_provider import orjson_default
 from . import app
 
+# Number of rows fetched from the database at a time when streaming lists
+ROWS_PER_FETCH = 500
+
+# Lists read plain rows with SQLAlchemy Core instead of hydrating Products
+PRODUCT_TABLE = Product.__table__
+LIST_PRODUCTS = select(
+    PRODUCT_TABLE.c.id,
+    PRODUCT_TABLE.c.name,
+    PRODUCT_TABLE.c.description,
+    PRODUCT_TABLE.c.price,
+    PRODUCT_TABLE.c.available,
+    # orjson encodes Enums by value, so read the stored category name instead
+    type_coerce(PRODUCT_TABLE.c.category, String).label("category"),
+).execution_options(yield_per=ROWS_PER_FETCH)
+
+# Pre-rendered body for missing Products, formatted with the product id. The
+# message matches str() of the NotFound that abort() raised before
+PRODUCT_NOT_FOUND = (
+    b'{"status":404,"error":"Not Found",'
+    b'"message":"404 Not Found: Product with id \'%d\' was not found."}'
+)
+
+# Query string values that mean True
+TRUE_VALUES = frozenset(("true", "yes", "1"))
+
+# (ETag, serialized Product) pairs by id, used when PRODUCT_CACHE_ENABLED is set
+product_cache = LRUCache(app.config["PRODUCT_CACHE_SIZE"], ttl=app.config["PRODUCT_CACHE_TTL"])
+
+# Product URL prefixes by request root, bounded because Host is client supplied
+product_url_bases = LRUCache(64)
+
 
 ######################################################################
 # H E A L T H   C H E C K
@@ -46,25 +83,69 @@ def index():
 ######################################################################
 #  U T I L I T Y   F U N C T I O N S
 ######################################################################
+@lru_cache(maxsize=None)
+def content_type_pattern(content_type):
+    """Compiles a pattern matching content_type with or without parameters"""
+    return re.compile(rf"^{re.escape(content_type)}\s*(;.*)?$", re.IGNORECASE)
+
+
 def check_content_type(content_type):
     """Checks that the media type is correct"""
-    if "Content-Type" not in request.headers:
-        app.logger.error("No Content-Type specified.")
-        abort(
-            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            f"Content-Type must be {content_type}",
-        )
-
-    if request.headers["Content-Type"] == content_type:
+    request_type = request.headers.get("Content-Type", "")
+    if content_type_pattern(content_type).match(request_type):
         return
 
-    app.logger.error("Invalid Content-Type: %s", request.headers["Content-Type"])
+    app.logger.error("Invalid Content-Type: %s", request_type)
     abort(
         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
         f"Content-Type must be {content_type}",
     )
 
 
+def product_etag(product):
+    """Returns an ETag that changes whenever the Product is updated"""
+    version = f"{product.id}:{product.updated_at.isoformat()}"
+    return hashlib.blake2b(version.encode(), digest_size=8).hexdigest()
+
+
+def product_not_found(product_id):
+    """Returns a 404 response for a missing Product without going through abort()"""
+    app.logger.warning("404 Not Found: Product with id '%s' was not found.", product_id)
+    return PRODUCT_NOT_FOUND % product_id, status.HTTP_404_NOT_FOUND, {"Content-Type": "application/json"}
+
+
+def product_url(product_id):
+    """Returns the external URL of a Product without rebuilding it from the URL map"""
+    url_root = request.url_root
+    base = product_url_bases.get(url_root)
+    if base is None:
+        base = url_for("get_products", product_id=0, _external=True).rsplit("/", 1)[0]
+        product_url_bases.put(url_root, base)
+    return f"{base}/{product_id}"
+
+
+def get_json_body():
+    """Parses the request body as JSON with orjson"""
+    try:
+        data = orjson.loads(request.get_data(cache=False) or b"{}")
+    except orjson.JSONDecodeError as error:
+        abort(status.HTTP_400_BAD_REQUEST, f"Invalid JSON: {error}")
+    return data
+
+
+def stream_products(rows):
+    """Streams product rows as a JSON array one row at a time"""
+    count = 0
+    yield b"["
+    for row in rows:
+        if count:
+            yield b","
+        yield orjson.dumps(dict(row), default=orjson_default)
+        count += 1
+    yield b"]"
+    app.logger.info("Returned %d products", count)
+
+
 ######################################################################
 # C R E A T E   A   N E W   P R O D U C T
 ######################################################################
@@ -77,7 +158,7 @@ def create_products():
     app.logger.info("Request to Create a Product...")
     check_content_type("application/json")
 
-    data = request.get_json()
+    data = get_json_body()
     app.logger.info("Processing: %s", data)
     product = Product()
     product.deserialize(data)
@@ -86,7 +167,7 @@ def create_products():
 
     message = product.serialize()
 
-    location_url = url_for("get_products", product_id=product.id, _external=True)
+    location_url = product_url(product.id)
     return jsonify(message), status.HTTP_201_CREATED, {"Location": location_url}
 
 
@@ -100,33 +181,41 @@ def list_products():
     """
     app.logger.info("Request a list of products")
 
-    products = []
     name = request.args.get("name")
     category = request.args.get("category")
     available = request.args.get("available")
     price = request.args.get("price")
 
+    statement = LIST_PRODUCTS
     if name:
-        app.logger.info(f"Find products with name: {name}")
-        products = Product.find_by_name(name)
-    elif category:
-        app.logger.info(f"Find products in category: {category}")
-        category_value = getattr(Category, category.upper())
-        products = Product.find_by_category(category_value)
-    elif available:
-        app.logger.info(f"Find products by availability: {available}")
-        available_value = available.lower() in ["true", "yes", "1"]
-        products = Product.find_by_availability(available_value)
-    elif price:
-        app.logger.info(f"Find products with price: {price}")
-        products = Product.find_by_price(price)
-    else:
-        app.logger.info("Find all products")
-        products = Product.all()
+        app.logger.info("Find products with name: %s", name)
+        statement = statement.where(PRODUCT_TABLE.c.name == name)
+    if category:
+        app.logger.info("Find products in category: %s", category)
+        category_value = CATEGORY_BY_NAME.get(category.upper())
+        if category_value is None:
+            abort(status.HTTP_400_BAD_REQUEST, f"Invalid category: {category}")
+        statement = statement.where(PRODUCT_TABLE.c.category == category_value)
+    if available:
+        app.logger.info("Find products by availability: %s", available)
+        available_value = available.lower() in TRUE_VALUES
+        statement = statement.where(PRODUCT_TABLE.c.available == available_value)
+    if price:
+        app.logger.info("Find products with price: %s", price)
+        # Invalid prices raise DataValidationError, which is returned as 400
+        # The raw string takes the cents fast path, Decimal is only for the exact compare
+        price_cents = price_to_cents(price)
+        statement = statement.where(
+            PRODUCT_TABLE.c.price_cents == price_cents,
+            PRODUCT_TABLE.c.price == parse_price(price),
+        )
 
-    results = [product.serialize() for product in products]
-    app.logger.info(f"Returning {len(results)} products")
-    return results, status.HTTP_200_OK
+    rows = db.session.execute(statement).mappings()
+    return Response(
+        stream_with_context(stream_products(rows)),
+        status=status.HTTP_200_OK,
+        mimetype="application/json",
+    )
 
 
 ######################################################################
@@ -138,14 +227,30 @@ def get_products(product_id):
     Retrieve a single Product
     This endpoint returns a Product based on its ID
     """
-    app.logger.info(f"Request to Retrieve a product with id '{product_id}'")
+    app.logger.info("Request to Retrieve a product with id '%s'", product_id)
 
-    found_product = Product.find(product_id)
-    if not found_product:
-        abort(status.HTTP_404_NOT_FOUND, f"Product with id '{product_id}' was not found.")
+    cache_enabled = app.config["PRODUCT_CACHE_ENABLED"]
+    cached = product_cache.get(product_id) if cache_enabled else None
+    if cached is None:
+        # Taken before the read so a concurrent update's eviction is not undone
+        cache_version = product_cache.version()
+        found_product = Product.find(product_id)
+        if not found_product:
+            return product_not_found(product_id)
+        cached = (product_etag(found_product), found_product.serialize())
+        if cache_enabled:
+            product_cache.put(product_id, cached, cache_version)
 
-    app.logger.info(f"Returning product: '{found_product.name}")
-    return found_product.serialize(), status.HTTP_200_OK
+    etag, message = cached
+    # If-None-Match uses weak comparison (RFC 7232 3.2), so W/"..." matches too
+    if request.if_none_match.contains_weak(etag):
+        app.logger.info("Product with id '%s' was not modified", product_id)
+        response = app.response_class(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        app.logger.info("Returning product: '%s'", message["name"])
+        response = jsonify(message)
+    response.set_etag(etag)
+    return response
 
 
 ######################################################################
@@ -157,17 +262,16 @@ def update_product(product_id):
     Updates a Product
     Thsi endpoint updates the product with the given ID using the data from the request body
     """
-    app.logger.info(f"Request to Update a product with id '{product_id}'")
+    app.logger.info("Request to Update a product with id '%s'", product_id)
     check_content_type("application/json")
 
-    found_product = Product.find(product_id)
-    if not found_product:
-        abort(status.HTTP_404_NOT_FOUND, f"Product with id '{product_id}' was not found.")
+    data = get_json_body()
+    updated_product = Product.update_by_id(product_id, data)
+    if not updated_product:
+        return product_not_found(product_id)
 
-    data = request.get_json()
-    found_product.deserialize(data)
-    found_product.update()
-    return found_product.serialize(), status.HTTP_200_OK
+    product_cache.evict(product_id)
+    return updated_product.serialize(), status.HTTP_200_OK
 
 
 ######################################################################
@@ -179,9 +283,8 @@ def delete_product(product_id):
     Deletes a Product
     Thsi endpoint deletes the product with the given ID
     """
-    app.logger.info(f"Request to Delete a product with id '{product_id}'")
+    app.logger.info("Request to Delete a product with id '%s'", product_id)
 
-    found_product = Product.find(product_id)
-    if found_product:
-        found_product.delete()
+    Product.delete_by_id(product_id)
+    product_cache.evict(product_id)
     return "", status.HTTP_204_NO_CONTENT
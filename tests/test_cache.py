@@ -0,0 +1,78 @@
+######################################################################
+# Copyright 2016, 2023 John J. Rofrano. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+######################################################################
+"""
+Test cases for the LRU Cache
+"""
+from unittest import TestCase
+from unittest.mock import patch
+from service.common.cache import LRUCache
+
+
+class TestLRUCache(TestCase):
+    """LRU Cache tests"""
+
+    def test_get_and_put(self):
+        """It should return cached values and None for misses"""
+        cache = LRUCache(2)
+        cache.put(1, "one")
+        self.assertEqual(cache.get(1), "one")
+        self.assertIsNone(cache.get(2))
+
+    def test_discards_least_recently_used(self):
+        """It should discard the least recently used entry when full"""
+        cache = LRUCache(2)
+        cache.put(1, "one")
+        cache.put(2, "two")
+        cache.get(1)
+        cache.put(3, "three")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(1), "one")
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), "three")
+
+    def test_evict_and_clear(self):
+        """It should evict a single entry and clear all entries"""
+        cache = LRUCache()
+        cache.put(1, "one")
+        cache.put(2, "two")
+        cache.evict(1)
+        cache.evict(99)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    @patch("service.common.cache.time.monotonic")
+    def test_entries_expire(self, monotonic_mock):
+        """It should not return entries older than the ttl"""
+        monotonic_mock.return_value = 100.0
+        cache = LRUCache(ttl=30)
+        cache.put(1, "one")
+        monotonic_mock.return_value = 129.0
+        self.assertEqual(cache.get(1), "one")
+        monotonic_mock.return_value = 130.0
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache), 0)
+
+    def test_put_after_evict_is_ignored(self):
+        """It should not cache a value read before a later eviction"""
+        cache = LRUCache()
+        version = cache.version()
+        cache.evict(1)
+        cache.put(1, "stale", version)
+        self.assertIsNone(cache.get(1))
+        cache.put(1, "fresh", cache.version())
+        self.assertEqual(cache.get(1), "fresh")
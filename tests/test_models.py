@@ -27,7 +27,7 @@ import os
 import logging
 import unittest
 from decimal import Decimal
-from service.models import Product, Category, db, DataValidationError
+from service.models import Product, Category, db, DataValidationError, price_to_cents
 from service import app
 from tests.factories import ProductFactory
 
@@ -59,13 +59,26 @@ class TestProductModel(unittest.TestCase):
 
     def setUp(self):
         """This runs before each test"""
-        db.session.query(Product).delete()  # clean up the last tests
+        db.session.execute(Product.__table__.delete())  # clean up the last tests
         db.session.commit()
 
     def tearDown(self):
         """This runs after each test"""
         db.session.remove()
 
+    ######################################################################
+    #  U T I L I T Y   F U N C T I O N S
+    ######################################################################
+
+    def _bulk_create(self, count: int) -> list:
+        """Saves count fake products in a single round-trip"""
+        products = [ProductFactory() for _ in range(count)]
+        for product in products:
+            product.id = None
+        db.session.bulk_save_objects(products)
+        db.session.commit()
+        return products
+
     ######################################################################
     #  T E S T   C A S E S
     ######################################################################
@@ -82,6 +95,43 @@ class TestProductModel(unittest.TestCase):
         self.assertEqual(product.price, 12.50)
         self.assertEqual(product.category, Category.CLOTHS)
 
+    def test_price_in_cents(self):
+        """It should keep the price in whole cents whenever the price is set"""
+        product = Product(name="Fedora", description="A red hat", price=12.50, available=True, category=Category.CLOTHS)
+        self.assertEqual(product.price_cents, 1250)
+        product.price = Decimal("0.995")
+        self.assertEqual(product.price_cents, 100)
+        product.price = None
+        self.assertIsNone(product.price_cents)
+        with self.assertRaises(DataValidationError):
+            product.price = Decimal("NaN")
+        with self.assertRaises(DataValidationError):
+            product.price = Decimal("1e30")
+
+    def test_deserialize_an_invalid_price(self):
+        """It should not Deserialize a product whose price is not a finite number in range"""
+        data = ProductFactory().serialize()
+        for price in ["NaN", "Infinity", "1e999999", "1e30", "cheap"]:
+            data["price"] = price
+            self.assertRaises(DataValidationError, Product().deserialize, data)
+
+    def test_price_to_cents(self):
+        """It should convert prices in any supported form to whole cents"""
+        self.assertEqual(price_to_cents(" \"12.50\" "), 1250)
+        self.assertEqual(price_to_cents("12"), 1200)
+        self.assertEqual(price_to_cents("12."), 1200)
+        self.assertEqual(price_to_cents("0.994"), 99)
+        self.assertEqual(price_to_cents("0.995"), 100)
+        self.assertEqual(price_to_cents(".5"), 50)
+        self.assertEqual(price_to_cents("1e2"), 10000)
+        self.assertEqual(price_to_cents(Decimal("3.10")), 310)
+        self.assertEqual(price_to_cents(12.5), 1250)
+
+    def test_price_to_cents_rejects_invalid_prices(self):
+        """It should not convert prices that are not finite numbers that fit in cents"""
+        for price in ["nan", "Infinity", "-inf", "abc", "1.2.3", "1e999999", "9" * 30, "9" * 5000, "-" + "9" * 5000, Decimal("NaN")]:
+            self.assertRaises(DataValidationError, price_to_cents, price)
+
     def test_add_a_product(self):
         """It should Create a product and add it to the database"""
         products = Product.all()
@@ -130,6 +180,18 @@ class TestProductModel(unittest.TestCase):
         self.assertEqual(products[0].id, old_id)
         self.assertEqual(products[0].description, "Updated description.")
 
+    def test_update_a_product_by_id(self):
+        """It should Update a product by id in a single statement"""
+        product = ProductFactory()
+        product.create()
+        data = product.serialize()
+        data["description"] = "Updated description."
+        updated_product = Product.update_by_id(product.id, data)
+        self.assertEqual(updated_product.id, product.id)
+        self.assertEqual(updated_product.description, "Updated description.")
+        self.assertEqual(Product.find(product.id).description, "Updated description.")
+        self.assertIsNone(Product.update_by_id(0, data))
+
     def test_update_with_missing_id(self):
         """It should raise an error when trying to update a product that doesn't have an ID"""
         product = ProductFactory()
@@ -137,6 +199,14 @@ class TestProductModel(unittest.TestCase):
         product.id = None
         self.assertRaises(DataValidationError, product.update)
 
+    def test_deserialize_an_unknown_category(self):
+        """It should not Deserialize a product with an unknown category"""
+        data = ProductFactory().serialize()
+        data["category"] = "SPACESHIPS"
+        product = Product(category=Category.FOOD)
+        self.assertRaises(DataValidationError, product.deserialize, data)
+        self.assertEqual(product.category, Category.FOOD)
+
     def test_delete_a_product(self):
         """It should Delete a product in the database"""
         product = ProductFactory()
@@ -145,19 +215,26 @@ class TestProductModel(unittest.TestCase):
         product.delete()
         self.assertEqual(len(Product.all()), 0)
 
+    def test_delete_a_product_by_id(self):
+        """It should Delete a product by id in a single statement"""
+        product = ProductFactory()
+        product.create()
+        product_id = product.id
+        self.assertTrue(Product.delete_by_id(product_id))
+        self.assertEqual(len(Product.all()), 0)
+        self.assertFalse(Product.delete_by_id(product_id))
+
     def test_list_all_products(self):
         """It should list all products in the database"""
         products = Product.all()
         self.assertEqual(len(products), 0)
-        for _ in range(5):
-            ProductFactory().create()
+        self._bulk_create(5)
         products = Product.all()
         self.assertEqual(len(products), 5)
 
     def test_find_a_product_by_name(self):
         """It should find a product by name"""
-        for _ in range(5):
-            ProductFactory().create()
+        self._bulk_create(5)
         products = Product.all()
         name = products[0].name
         count = len([product for product in products if product.name == name])
@@ -168,8 +245,7 @@ class TestProductModel(unittest.TestCase):
 
     def test_find_a_product_by_availability(self):
         """It should find a product by availability"""
-        for _ in range(10):
-            ProductFactory().create()
+        self._bulk_create(10)
         products = Product.all()
         available = products[0].available
         count = len([product for product in products if product.available == available])
@@ -180,8 +256,7 @@ class TestProductModel(unittest.TestCase):
 
     def test_find_a_product_by_category(self):
         """It should find a product by category"""
-        for _ in range(10):
-            ProductFactory().create()
+        self._bulk_create(10)
         products = Product.all()
         category = products[0].category
         count = len([product for product in products if product.category == category])
@@ -192,8 +267,7 @@ class TestProductModel(unittest.TestCase):
 
     def test_find_a_product_by_price(self):
         """It should find a product by price"""
-        for _ in range(10):
-            ProductFactory().create()
+        self._bulk_create(10)
         products = Product.all()
         price = products[0].price
         count = len([product for product in products if product.price == price])
@@ -202,10 +276,23 @@ class TestProductModel(unittest.TestCase):
         for product in found_products:
             self.assertEqual(product.price, price)
 
+    def test_find_a_product_by_exact_price(self):
+        """It should only find products whose price matches exactly, not just to the cent"""
+        for price in ["12.50", "12.504", "12.495"]:
+            product = ProductFactory(price=Decimal(price))
+            product.create()
+        found_products = Product.find_by_price("12.50")
+        self.assertEqual(found_products.count(), 1)
+        self.assertEqual(found_products[0].price, Decimal("12.50"))
+
+    def test_find_a_product_by_invalid_price(self):
+        """It should not find products for a price that is not a finite number"""
+        self.assertRaises(DataValidationError, Product.find_by_price, "nan")
+        self.assertRaises(DataValidationError, Product.find_by_price, "1e999999")
+
     def test_find_a_product_by_string_price(self):
         """It should find a product by price when the price is a string"""
-        for _ in range(10):
-            ProductFactory().create()
+        self._bulk_create(10)
         products = Product.all()
         price = products[0].price
         count = len([product for product in products if product.price == price])
@@ -25,6 +25,7 @@ Test cases can be run with the following:
     nosetests --stop tests/test_service.py:TestProductService
 """
 import os
+import json
 import logging
 from decimal import Decimal
 from unittest import TestCase
@@ -32,6 +33,7 @@ from urllib.parse import quote_plus
 from service import app
 from service.common import status
 from service.models import db, init_db, Product
+from service.routes import product_cache
 from tests.factories import ProductFactory
 
 # Disable all but critical errors during normal test run
@@ -72,8 +74,10 @@ class TestProductRoutes(TestCase):
         self.client = app.test_client()
         db.session.query(Product).delete()  # clean up the last tests
         db.session.commit()
+        product_cache.clear()
 
     def tearDown(self):
+        app.config["PRODUCT_CACHE_ENABLED"] = False
         db.session.remove()
 
     ############################################################
@@ -150,6 +154,27 @@ class TestProductRoutes(TestCase):
         response = self.client.post(BASE_URL, json=new_product)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_product_with_invalid_price(self):
+        """It should not Create a Product whose price is not a finite number in range"""
+        new_product = ProductFactory().serialize()
+        for price in ["NaN", "1e30"]:
+            new_product["price"] = price
+            response = self.client.post(BASE_URL, json=new_product)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_product_invalid_json(self):
+        """It should not Create a Product from a body that is not valid JSON"""
+        response = self.client.post(BASE_URL, data="{bad json", content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_product_content_type_with_charset(self):
+        """It should Create a Product when the Content-Type has parameters"""
+        test_product = ProductFactory()
+        response = self.client.post(
+            BASE_URL, data=json.dumps(test_product.serialize()), content_type="application/json; charset=utf-8"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
     def test_create_product_no_content_type(self):
         """It should not Create a Product with no Content-Type"""
         response = self.client.post(BASE_URL, data="bad data")
@@ -170,12 +195,56 @@ class TestProductRoutes(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.get_json()["name"], test_product.name)
 
+    def test_get_product_not_modified(self):
+        """It should return 304 Not Modified when the client has the current version"""
+        test_product = self._create_products()[0]
+        response = self.client.get(f"{BASE_URL}/{test_product.id}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag)
+
+        response = self.client.get(f"{BASE_URL}/{test_product.id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(response.data), 0)
+
+        # Proxies that compress responses commonly send the weak form back
+        response = self.client.get(f"{BASE_URL}/{test_product.id}", headers={"If-None-Match": f"W/{etag}"})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        test_product.description = "Updated description for etag tests."
+        response = self.client.put(f"{BASE_URL}/{test_product.id}", json=test_product.serialize())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(f"{BASE_URL}/{test_product.id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers.get("ETag"), etag)
+
     def test_get_product_not_found(self):
         """It should return a 404 error if the product is not found"""
         response = self.client.get(f"{BASE_URL}/0")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         data = response.get_json()
         self.assertIn("was not found", data["message"])
+        self.assertEqual(data["message"], "404 Not Found: Product with id '0' was not found.")
+        self.assertEqual(data["error"], "Not Found")
+
+    def test_get_product_cached(self):
+        """It should serve a cached product until it is updated or deleted"""
+        app.config["PRODUCT_CACHE_ENABLED"] = True
+        test_product = self._create_products()[0]
+        response = self.client.get(f"{BASE_URL}/{test_product.id}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(product_cache), 1)
+
+        test_product.description = "Updated description for cache tests."
+        response = self.client.put(f"{BASE_URL}/{test_product.id}", json=test_product.serialize())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(f"{BASE_URL}/{test_product.id}")
+        self.assertEqual(response.get_json()["description"], test_product.description)
+
+        response = self.client.delete(f"{BASE_URL}/{test_product.id}")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(f"{BASE_URL}/{test_product.id}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     # ----------------------------------------------------------
     # TEST UPDATE
@@ -258,6 +327,11 @@ class TestProductRoutes(TestCase):
         for product in data:
             self.assertEqual(product["category"], category.name)
 
+    def test_list_products_by_invalid_category(self):
+        """It should not list products for an unknown category"""
+        response = self.client.get(BASE_URL, query_string="category=SPACESHIPS")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     # ----------------------------------------------------------
     # TEST FIND BY AVAILABILITY
     # ----------------------------------------------------------
@@ -290,6 +364,30 @@ class TestProductRoutes(TestCase):
         for product in data:
             self.assertEqual(product["price"], str(test_price))
 
+    # ----------------------------------------------------------
+    # TEST FIND BY MULTIPLE FILTERS
+    # ----------------------------------------------------------
+    def test_list_products_by_category_and_availability(self):
+        """It should get a list of products matching every filter given"""
+        products = self._create_products(10)
+        category = products[0].category
+        matching_count = len(
+            [product for product in products if product.category == category and product.available is True]
+        )
+        response = self.client.get(BASE_URL, query_string=f"category={category.name}&available=true")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.get_json()
+        self.assertEqual(len(data), matching_count)
+        for product in data:
+            self.assertEqual(product["category"], category.name)
+            self.assertTrue(product["available"])
+
+    def test_list_products_by_invalid_price(self):
+        """It should not list products for a price that is not a finite number"""
+        for price in ["cheap", "nan", "Infinity", "1e999999"]:
+            response = self.client.get(BASE_URL, query_string=f"price={price}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     ######################################################################
     # Utility functions
     ######################################################################